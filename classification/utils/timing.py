@@ -1,10 +1,27 @@
-import os, gc, time
-def set_cpu_threads(n=8): os.environ.setdefault("OMP_NUM_THREADS", str(n))
+import os, gc, sys, time, warnings
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_MAX_THREADS", "VECLIB_MAXIMUM_THREADS")
+def set_cpu_threads(n=8):
+    # BLAS/OpenMP read these once at load time, so call before importing numpy
+    for k in _THREAD_ENV_VARS: os.environ[k] = str(n)
+    if "numpy" in sys.modules:
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(n)  # rebind the already-loaded pools
+        except ImportError:
+            warnings.warn("numpy already imported; thread env vars may not take effect", RuntimeWarning)
 def _sync(use_gpu: bool):
     if use_gpu:
         import cupy as cp
         cp.cuda.Device().synchronize()
 def run_timed(label, fn, use_gpu, *a, **k):
     gc.collect(); _sync(use_gpu)
-    t0=time.perf_counter(); out=fn(*a, **k); _sync(use_gpu)
-    dt=time.perf_counter()-t0; print(f"{label}: {dt:.3f}s"); return out, dt
+    if use_gpu:
+        # CUDA events time the work on the device; only the end event is waited on
+        import cupy as cp
+        start, end = cp.cuda.Event(), cp.cuda.Event()
+        start.record(); out=fn(*a, **k); end.record(); end.synchronize()
+        dt=cp.cuda.get_elapsed_time(start, end)/1e3
+    else:
+        t0=time.perf_counter_ns(); out=fn(*a, **k)
+        dt=(time.perf_counter_ns()-t0)/1e9
+    print(f"{label}: {dt:.3f}s"); return out, dt
@@ -1,64 +1,103 @@
+import io
 import os
 import zipfile
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import json
 import re
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
-def parse_homberger_file(file_path):
+CUSTOMER_DTYPES = {
+    'customer_id': np.int32,
+    'x': np.float32,
+    'y': np.float32,
+    'demand': np.int16,
+    'tw_start': np.int32,
+    'tw_end': np.int32,
+    'service_time': np.int16
+}
+
+# Characters in instance names that are replaced with '_' in output filenames
+INSTANCE_NAME_TRANSLATION = str.maketrans({'.': '_', ' ': '_'})
+
+# zstd instead of the snappy default; dictionary encoding only for the low-cardinality
+# columns, delta encoding for the sorted/near-sorted integer columns
+PARQUET_WRITE_OPTIONS = {
+    'compression': 'zstd',
+    'compression_level': 3,
+    'use_dictionary': ['demand', 'service_time'],
+    'column_encoding': {
+        'customer_id': 'DELTA_BINARY_PACKED',
+        'tw_start': 'DELTA_BINARY_PACKED',
+        'tw_end': 'DELTA_BINARY_PACKED',
+    },
+    'data_page_version': '2.0',
+    'write_statistics': True,
+}
+
+def parse_homberger_file(source):
     """
     Parse a Homberger VRPTW instance file (.txt format) and return structured data.
+
+    Args:
+        source: Path to the instance file, or an open file-like object
+            (text or binary, e.g. from ZipFile.open)
+
+    Returns:
+        tuple: (customers_table, params) - customers as a pyarrow.Table
+               (call .to_pandas() for a DataFrame) and the instance parameters dict
     """
-    with open(file_path, 'r') as f:
-        lines = [line.strip() for line in f.readlines() if line.strip()]
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            raw = f.read()
+    else:
+        raw = source.read()
+    text = raw.decode() if isinstance(raw, bytes) else raw
+
+    # splitlines() also handles CRLF line endings; lines are only stripped where
+    # needed, the customer table is handed to numpy verbatim
+    lines = [line for line in text.splitlines() if line and not line.isspace()]
 
     # Find the "CUSTOMER" header and its index
     for idx, line in enumerate(lines):
-        if line.startswith("CUSTOMER"):
+        if line.lstrip().startswith("CUSTOMER"):
             customer_header_idx = idx
             break
     else:
         raise ValueError("CUSTOMER header not found in file")
 
     # Parse instance name from first line
-    instance_name = lines[0]
+    instance_name = lines[0].strip()
 
     # Parse number of customers and vehicle capacity from the line before "CUSTOMER"
     header_parts = lines[customer_header_idx - 1].split()
     num_customers = int(header_parts[0]) - 1  # Exclude depot
     vehicle_capacity = int(header_parts[1])
 
-    # Parse customer data (lines after "CUSTOMER")
-    customers = []
-    depot = None
-    for line in lines[customer_header_idx + 1:]:
-        parts = line.split()
-        if len(parts) != 7:
-            continue  # skip malformed lines
-        customer_data = {
-            'customer_id': int(parts[0]),
-            'x': float(parts[1]),
-            'y': float(parts[2]),
-            'demand': int(parts[3]),
-            'tw_start': int(parts[4]),
-            'tw_end': int(parts[5]),
-            'service_time': int(parts[6])
-        }
-        if customer_data['customer_id'] == 0:
-            depot = customer_data
-        else:
-            customers.append(customer_data)
-
-    customers_df = pd.DataFrame(customers).astype({
-        'customer_id': 'int32',
-        'x': 'float32',
-        'y': 'float32',
-        'demand': 'int16',
-        'tw_start': 'int32',
-        'tw_end': 'int32',
-        'service_time': 'int16'
+    # Parse customer data (lines after "CUSTOMER") in a single vectorized pass,
+    # skipping the column header row that precedes the numeric values
+    data_start = customer_header_idx + 1
+    while data_start < len(lines) and not lines[data_start].lstrip()[:1].isdigit():
+        data_start += 1
+    values = np.loadtxt(lines[data_start:], dtype=np.float64, ndmin=2)
+    if values.shape[1] != 7:
+        raise ValueError(f"Expected 7 customer columns, found {values.shape[1]}")
+
+    is_depot = values[:, 0] == 0
+    depot_rows = values[is_depot]
+    depot = dict(zip(CUSTOMER_DTYPES, depot_rows[0])) if len(depot_rows) else None
+
+    # Build each column at its final dtype straight into Arrow, no pandas in between
+    customer_rows = values[~is_depot]
+    customers_table = pa.table({
+        name: customer_rows[:, i].astype(dtype, copy=False)
+        for i, (name, dtype) in enumerate(CUSTOMER_DTYPES.items())
     })
 
-    total_demand = customers_df['demand'].sum()
+    total_demand = pc.sum(customers_table['demand']).as_py() or 0
     estimated_vehicles = max(1, int((total_demand / vehicle_capacity) * 1.2))
 
     params = {
@@ -74,11 +113,34 @@ def parse_homberger_file(file_path):
         }
     }
 
-    return customers_df, params
+    return customers_table, params
+
+def _convert_one(item):
+    """Parse one in-memory instance and write its Parquet + JSON files (worker process)."""
+    instance_file, data, output_dir = item
+    customers_table, params = parse_homberger_file(io.BytesIO(data))
+
+    # Generate output filenames
+    instance_name = params['instance'].translate(INSTANCE_NAME_TRANSLATION)
+    customers_path = Path(output_dir) / f"{instance_name}_customers.parquet"
+    params_path = Path(output_dir) / f"{instance_name}_params.json"
+
+    # Save to Parquet and JSON
+    pq.write_table(customers_table, customers_path, **PARQUET_WRITE_OPTIONS)
+
+    with open(params_path, 'w') as f:
+        json.dump(params, f, indent=2)
+
+    print(f"✅ Converted {instance_file}:")
+    print(f"   Customers: {customers_path} ({customers_table.num_rows} customers)")
+    print(f"   Parameters: {params_path}")
+    print(f"   Vehicles: {params['K']}, Capacity: {params['Q']}")
+
+    return customers_path, params_path, customers_table, params
 
 def convert_homberger_to_parquet(zip_path, instance_pattern="rc2.*\\.txt", output_dir="../data/vrptw/homberger"):
     """
-    Extract a Homberger instance from ZIP, convert to Parquet + JSON format.
+    Extract all matching Homberger instances from ZIP, convert each to Parquet + JSON format.
     
     Args:
         zip_path: Path to the ZIP file containing instances
@@ -86,53 +148,33 @@ def convert_homberger_to_parquet(zip_path, instance_pattern="rc2.*\\.txt", outpu
         output_dir: Directory to save output files
         
     Returns:
-        tuple: (customers_parquet_path, params_json_path)
+        list: (customers_parquet_path, params_json_path, customers_table, params) tuples,
+              one per converted instance
     """
     os.makedirs(output_dir, exist_ok=True)
     
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        # Find matching instance files
-        matching_files = [f for f in zip_ref.namelist() if re.match(instance_pattern, os.path.basename(f))]
+    # Load the archive with one sequential read; the central directory scan and every
+    # entry read below are then served from memory instead of seek + read syscalls
+    with open(zip_path, 'rb') as f:
+        archive = io.BytesIO(f.read())
+
+    with zipfile.ZipFile(archive, 'r') as zip_ref:
+        # Find matching instance files (ZIP member names always use '/' separators)
+        pattern = re.compile(instance_pattern)
+        matching_files = [f for f in zip_ref.namelist() if pattern.match(f.rsplit('/', 1)[-1])]
         
         if not matching_files:
             raise ValueError(f"No files matching pattern '{instance_pattern}' found in {zip_path}")
         
-        # Use the first matching file
-        instance_file = matching_files[0]
-        print(f"Converting instance: {instance_file}")
-        
-        # Extract to temporary location
-        temp_path = os.path.join(output_dir, "temp_instance.txt")
-        with zip_ref.open(instance_file) as source:
-            with open(temp_path, 'wb') as target:
-                target.write(source.read())
-        
-        try:
-            # Parse the instance
-            customers_df, params = parse_homberger_file(temp_path)
-            
-            # Generate output filenames
-            instance_name = params['instance'].replace('.', '_').replace(' ', '_')
-            customers_path = os.path.join(output_dir, f"{instance_name}_customers.parquet")
-            params_path = os.path.join(output_dir, f"{instance_name}_params.json")
-            
-            # Save to Parquet and JSON
-            customers_df.to_parquet(customers_path, index=False)
-            
-            with open(params_path, 'w') as f:
-                json.dump(params, f, indent=2)
-            
-            print(f"✅ Converted successfully:")
-            print(f"   Customers: {customers_path} ({len(customers_df)} customers)")
-            print(f"   Parameters: {params_path}")
-            print(f"   Vehicles: {params['K']}, Capacity: {params['Q']}")
-            
-            return customers_path, params_path
-            
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        # Entries are small, so read them all up front and keep the ZipFile in this process
+        print(f"Converting {len(matching_files)} instances")
+        items = [(name, zip_ref.read(name), output_dir) for name in matching_files]
+
+    # Parsing and Parquet encoding are CPU-bound and independent per instance
+    with ProcessPoolExecutor() as executor:
+        converted = list(executor.map(_convert_one, items))
+
+    return converted
 
 def main():
     """Convert Homberger instances from the organized data structure"""
@@ -178,22 +220,21 @@ def main():
             # Create series-specific output directory
             output_dir = os.path.join(base_data_dir, dataset['series'])
             
-            customers_path, params_path = convert_homberger_to_parquet(
+            converted = convert_homberger_to_parquet(
                 dataset['zip_path'], 
                 instance_pattern=dataset['pattern'],
                 output_dir=output_dir
             )
+            print(f"\n📦 Converted {len(converted)} instances from {dataset['series'].upper()}")
             
-            # Display sample data
-            customers_df = pd.read_parquet(customers_path)
+            # Display sample data from the first instance (already in memory, no re-read)
+            customers_path, params_path, customers_table, params = converted[0]
             print(f"\n📊 Sample customer data from {dataset['series'].upper()}:")
-            print(customers_df.head(3))
+            print(customers_table.slice(0, 3).to_pandas())
             
-            with open(params_path, 'r') as f:
-                params = json.load(f)
             print(f"\n⚙️  Instance parameters:")
             print(f"   Instance: {params['instance']}")
-            print(f"   Customers: {len(customers_df)}")
+            print(f"   Customers: {customers_table.num_rows}")
             print(f"   Vehicles: {params['K']}")
             print(f"   Capacity: {params['Q']}")
             print(f"   Depot: ({params['depot']['x']}, {params['depot']['y']})")